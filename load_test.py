@@ -0,0 +1,427 @@
+"""
+Load-test harness for the CoARA Signatories dashboard.
+
+Drives simulated Streamlit sessions through the About / Insights / country-select /
+map-toggle flows using Streamlit's AppTest, and reports per-interaction latency
+percentiles and per-worker RSS.
+
+Each worker is a separate process (like a separate server replica) that opens
+several sessions and advances them round-robin, one interaction at a time.
+AppTest instances share runtime state, so sessions inside one worker do not
+rerun in parallel; concurrency comes from running several workers.
+
+Memory is reported in two parts, because app.py re-executes from scratch on
+every rerun and most of its growth is process-wide rather than per session:
+- per rerun: RSS still held after every session has been dropped, divided by
+  the number of reruns, next to the number of matplotlib figures left open;
+- per session: RSS released when the idle sessions are dropped, divided by
+  the number of sessions.
+Both are RSS differences, so they are only meaningful over several sessions
+and reruns; freed heap is trimmed back to the OS before each reading on Linux.
+
+Usage:
+    python load_test.py --workers 2 --sessions 4 --iterations 3
+    python load_test.py --workers 4 --sessions 8 --json results.json
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue as queue_module
+import resource
+import sys
+import time
+
+# Render matplotlib figures off-screen inside the workers
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(APP_DIR, "app.py")
+
+# Order in which interactions are reported
+INTERACTIONS = [
+    "initial_load",
+    "open_about",
+    "open_insights",
+    "compare_countries",
+    "select_country",
+    "map_interactive",
+    "map_static",
+]
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+# Function to read the current resident set size of this process in MB
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm", 'r') as file:
+            resident_pages = int(file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Not on Linux, fall back to the peak value
+        return peak_rss_mb()
+
+
+# Function to read the peak resident set size of this process in MB
+def peak_rss_mb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+# Function to collect garbage and hand freed heap pages back to the OS, so RSS
+# drops when objects are released (glibc keeps them otherwise)
+def release_memory():
+    gc.collect()
+    libc_name = ctypes.util.find_library("c")
+    if sys.platform.startswith("linux") and libc_name:
+        try:
+            ctypes.CDLL(libc_name).malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    Args:
+    values (list): Measured values.
+    pct (float): Percentile between 0 and 100.
+
+    Returns:
+    float: The value at the requested percentile, or None for an empty list.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def find_widget(widgets, label):
+    # Unkeyed widgets in app.py can only be told apart by their label
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled {label!r} on the current page")
+
+
+def checked(at, name, action):
+    # Reruns report script errors on the AppTest instead of raising them
+    action()
+    if at.exception:
+        raise RuntimeError(f"{name}: {at.exception[0].message}")
+
+
+def warm_up(timeout):
+    """
+    Render every page used by the flows once, so first-use setup (imports,
+    plotly and matplotlib initialisation, font loading) is not charged to the
+    measured sessions.
+
+    Args:
+    timeout (float): Seconds allowed for a single script rerun.
+    """
+    from streamlit.testing.v1 import AppTest
+    import matplotlib.pyplot as plt
+
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    map_label = "Select the style in which the map is displayed"
+    checked(at, "warm_up", at.run)
+    checked(at, "warm_up", lambda: at.selectbox(key="selected_nav").select("📊 Insights").run())
+    compare = find_widget(at.multiselect, "Select the Countries to Include in the Bar Chart for Comparison")
+    checked(at, "warm_up", lambda: compare.set_value(list(compare.options)[:2]).run())
+    country = find_widget(at.selectbox, "Select a country to view the organizations that have signed the ARRA")
+    checked(at, "warm_up", lambda: country.select(country.options[0]).run())
+    checked(at, "warm_up", lambda: find_widget(at.selectbox, map_label).select("Interactive Map").run())
+    checked(at, "warm_up", lambda: find_widget(at.selectbox, map_label).select("Static Map").run())
+
+    # Start the measured run without the warm-up's figures
+    plt.close("all")
+    del at
+    release_memory()
+
+
+def run_session(at, session_id, iterations, latencies):
+    """
+    Drive one simulated user session through the dashboard flows.
+
+    The session yields after every rerun so a worker can interleave it with
+    other open sessions and count the reruns.
+
+    Args:
+    at (AppTest): The session's app, kept alive by the worker after the flow ends.
+    session_id (int): Index of the session, used to vary the selected countries.
+    iterations (int): How many times to repeat the flow within the session.
+    latencies (dict): Interaction name -> list of seconds, filled in place.
+    """
+    def timed(name, action):
+        start = time.perf_counter()
+        checked(at, name, action)
+        latencies[name].append(time.perf_counter() - start)
+
+    timed("initial_load", at.run)
+    yield
+
+    for iteration in range(iterations):
+        # About is the default page, so leave it first to time a real navigation
+        if at.selectbox(key="selected_nav").value == "📖 About":
+            checked(at, "clear_selection", lambda: at.selectbox(key="selected_nav").select("Clear Selection").run())
+            yield
+        timed("open_about", lambda: at.selectbox(key="selected_nav").select("📖 About").run())
+        yield
+        timed("open_insights", lambda: at.selectbox(key="selected_nav").select("📊 Insights").run())
+        yield
+
+        # Pick a different set of countries for each session and iteration
+        compare = find_widget(at.multiselect, "Select the Countries to Include in the Bar Chart for Comparison")
+        options = list(compare.options)
+        offset = (session_id + iteration) % len(options)
+        chosen = [options[offset], options[(offset + 1) % len(options)]]
+        timed("compare_countries", lambda: compare.set_value(chosen).run())
+        yield
+
+        country = find_widget(at.selectbox, "Select a country to view the organizations that have signed the ARRA")
+        timed("select_country", lambda: country.select(chosen[0]).run())
+        yield
+
+        map_label = "Select the style in which the map is displayed"
+        timed("map_interactive", lambda: find_widget(at.selectbox, map_label).select("Interactive Map").run())
+        yield
+        timed("map_static", lambda: find_widget(at.selectbox, map_label).select("Static Map").run())
+        yield
+
+
+def run_worker(worker_id, sessions, iterations, timeout, queue):
+    # The app reads its data files relative to the working directory
+    os.chdir(APP_DIR)
+
+    # Streamlit logs deprecation and missing-context warnings on every rerun.
+    # Its loggers each carry their own level, so set it through Streamlit.
+    import streamlit
+    import streamlit.logger
+    streamlit.config.set_option("logger.level", "error")
+    streamlit.logger.set_log_level(logging.ERROR)
+
+    from streamlit.testing.v1 import AppTest
+    import matplotlib.pyplot as plt
+
+    warm_up(timeout)
+
+    latencies = {name: [] for name in INTERACTIONS}
+    errors = []
+    reruns = 0
+    baseline_rss = current_rss_mb()
+    peak_during_load = baseline_rss
+
+    apps = {}
+    active = {}
+    for i in range(sessions):
+        session_id = worker_id * sessions + i
+        apps[session_id] = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        active[session_id] = run_session(apps[session_id], session_id, iterations, latencies)
+
+    while active:
+        for session_id, session in list(active.items()):
+            try:
+                next(session)
+                reruns += 1
+            except StopIteration:
+                del active[session_id]
+            except Exception as e:
+                reruns += 1
+                errors.append(f"session {session_id}: {e}")
+                del active[session_id]
+        peak_during_load = max(peak_during_load, current_rss_mb())
+
+    # Every session has finished its flow but is still open and idle
+    release_memory()
+    rss_sessions_open = current_rss_mb()
+    open_figures = len(plt.get_fignums())
+
+    # Whatever is still held once the sessions are gone is process-wide growth
+    apps.clear()
+    release_memory()
+    rss_sessions_dropped = current_rss_mb()
+
+    queue.put({
+        "worker": worker_id,
+        "sessions": sessions,
+        "reruns": reruns,
+        "latencies": latencies,
+        "errors": errors,
+        "open_figures": open_figures,
+        "rss_baseline_mb": baseline_rss,
+        "rss_sampled_peak_mb": peak_during_load,
+        "rss_sessions_open_mb": rss_sessions_open,
+        "rss_sessions_dropped_mb": rss_sessions_dropped,
+        "rss_max_mb": peak_rss_mb(),
+    })
+
+
+def summarize(results, worker_errors=()):
+    """
+    Aggregate worker results into latency percentiles and memory figures.
+
+    Args:
+    results (list): Dictionaries produced by run_worker.
+    worker_errors (list): Errors for workers that never reported results.
+
+    Returns:
+    dict: Summary with 'latency_ms', 'workers' and 'errors' keys.
+    """
+    merged = {name: [] for name in INTERACTIONS}
+    for result in results:
+        for name, values in result["latencies"].items():
+            merged[name].extend(values)
+
+    latency_ms = {}
+    for name in INTERACTIONS:
+        values = merged[name]
+        row = {"count": len(values)}
+        for pct in PERCENTILES:
+            row[f"p{pct}"] = percentile(values, pct) * 1000 if values else None
+        row["max"] = max(values) * 1000 if values else None
+        latency_ms[name] = row
+
+    workers = []
+    for result in sorted(results, key=lambda r: r["worker"]):
+        workers.append({
+            "worker": result["worker"],
+            "sessions": result["sessions"],
+            "reruns": result["reruns"],
+            "open_figures": result["open_figures"],
+            "rss_baseline_mb": result["rss_baseline_mb"],
+            "rss_sampled_peak_mb": result["rss_sampled_peak_mb"],
+            "rss_sessions_open_mb": result["rss_sessions_open_mb"],
+            "rss_sessions_dropped_mb": result["rss_sessions_dropped_mb"],
+            "rss_max_mb": result["rss_max_mb"],
+            "rss_per_rerun_mb": (result["rss_sessions_dropped_mb"] - result["rss_baseline_mb"]) / max(result["reruns"], 1),
+            "rss_per_session_mb": (result["rss_sessions_open_mb"] - result["rss_sessions_dropped_mb"]) / max(result["sessions"], 1),
+        })
+
+    errors = list(worker_errors) + [error for result in results for error in result["errors"]]
+    return {"latency_ms": latency_ms, "workers": workers, "errors": errors}
+
+
+def format_ms(value):
+    # Interactions without samples have no percentiles
+    return f"{'-':>10}" if value is None else f"{value:>10.1f}"
+
+
+def print_report(summary):
+    header = f"{'interaction':<20}{'count':>7}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}"
+    print("\nLatency per interaction (ms)")
+    print(header)
+    print("-" * len(header))
+    for name, row in summary["latency_ms"].items():
+        cells = "".join(format_ms(row[f"p{p}"]) for p in PERCENTILES)
+        print(f"{name:<20}{row['count']:>7}{cells}{format_ms(row['max'])}")
+
+    header = (f"{'worker':<8}{'sessions':>9}{'reruns':>8}{'figures':>9}{'baseline':>10}{'peak':>9}"
+              f"{'open':>9}{'dropped':>9}{'per rerun':>11}{'per sess.':>11}")
+    print("\nRSS per worker (MB)")
+    print(header)
+    print("-" * len(header))
+    for row in summary["workers"]:
+        print(f"{row['worker']:<8}{row['sessions']:>9}{row['reruns']:>8}{row['open_figures']:>9}"
+              f"{row['rss_baseline_mb']:>10.1f}{row['rss_sampled_peak_mb']:>9.1f}{row['rss_sessions_open_mb']:>9.1f}"
+              f"{row['rss_sessions_dropped_mb']:>9.1f}{row['rss_per_rerun_mb']:>11.1f}{row['rss_per_session_mb']:>11.1f}")
+    print("open: sessions idle but alive; dropped: after closing them; figures: pyplot figures left open")
+
+    if summary["errors"]:
+        print(f"\n{len(summary['errors'])} error(s):")
+        for error in summary["errors"]:
+            print(f"- {error}")
+
+
+def collect_results(processes, queue):
+    """
+    Wait for every worker to report, without hanging on workers that died.
+
+    Args:
+    processes (list): Worker processes, indexed by worker id.
+    queue (Queue): Queue the workers post their results to.
+
+    Returns:
+    dict: Worker id -> result for the workers that reported.
+    """
+    results = {}
+    pending = set(range(len(processes)))
+    while pending:
+        try:
+            result = queue.get(timeout=1.0)
+        except queue_module.Empty:
+            # A worker killed by the OOM killer or an exception never posts a result
+            dead = {worker_id for worker_id in pending if not processes[worker_id].is_alive()}
+            if not dead:
+                continue
+            # Drain anything a worker posted just before exiting
+            try:
+                while True:
+                    result = queue.get_nowait()
+                    results[result["worker"]] = result
+                    pending.discard(result["worker"])
+            except queue_module.Empty:
+                pass
+            pending -= dead
+            continue
+        results[result["worker"]] = result
+        pending.discard(result["worker"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the CoARA Signatories dashboard with simulated sessions.")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions per worker")
+    parser.add_argument("--iterations", type=int, default=3, help="times each session repeats the flow")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds allowed for a single rerun")
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Fresh interpreters per worker so RSS is not shared with the parent
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(i, args.sessions, args.iterations, args.timeout, queue))
+        for i in range(args.workers)
+    ]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    results = collect_results(processes, queue)
+    worker_errors = [
+        f"worker {worker_id} exited with code {processes[worker_id].exitcode} without reporting results"
+        for worker_id in range(args.workers) if worker_id not in results
+    ]
+    for process in processes:
+        process.join()
+    wall_time = time.perf_counter() - start
+
+    summary = summarize(list(results.values()), worker_errors)
+    summary["config"] = vars(args)
+    summary["wall_time_s"] = wall_time
+
+    print(f"{args.workers} worker(s) x {args.sessions} session(s) x {args.iterations} iteration(s) in {wall_time:.1f}s")
+    print_report(summary)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(summary, file, indent=2, allow_nan=False)
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())